@@ -17,11 +17,14 @@ class DepreciatedAction(argparse.Action):
     def __init__(self, option_strings, dest, **kwargs):
         if "help" in kwargs:
             kwargs["help"] = "[DEPRECATED] " + kwargs["help"]
+        # never populate the namespace unless the flag is actually passed, and accept it with or without a value
+        kwargs.setdefault("default", argparse.SUPPRESS)
+        kwargs.setdefault("nargs", "?")
         super().__init__(option_strings, dest, **kwargs)
     
     def __call__(self, parser, namespace, values, option_string=None):
+        # value is ignored, only warn
         Printer.depreciated_warning(option_string, self.help, CONFIG=False)
-        setattr(namespace, self.dest, values)
 
 
 DEPRECIATED_FLAGS = (
@@ -105,17 +108,20 @@ def main():
                            help=flag["help"],
                            action='depreciated_ignore_warn')
     
-    for key in DEPRECIATED_CONFIGS:
-        parser.add_argument(*DEPRECIATED_CONFIGS[key]['arg'],
-                            type=str,
-                            action='depreciated_ignore_warn',
-                            help=f'Delete the {key} flag from the commandline call')
+    config_group = parser.add_argument_group('config options',
+                                             'Override a config.json setting for this run only')
+    for key, config in CONFIG_VALUES.items():
+        config_group.add_argument(*config['arg'],
+                                  type=str,
+                                  dest=key.lower(),
+                                  default=None)
     
-    for key in CONFIG_VALUES:
-        parser.add_argument(*CONFIG_VALUES[key]['arg'],
-                            type=str,
-                            dest=key.lower(),
-                            default=None)
+    depreciated_group = parser.add_argument_group('depreciated config options')
+    for key, config in DEPRECIATED_CONFIGS.items():
+        depreciated_group.add_argument(*config['arg'],
+                                       type=str,
+                                       action='depreciated_ignore_warn',
+                                       help=f'Delete the {key} flag from the commandline call')
     
     parser.set_defaults(func=client)
     
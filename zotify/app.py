@@ -39,7 +39,7 @@ def download_from_urls(urls: list[str]) -> int:
                                NAME: get_playlist_info(playlist_id)[0]},
                                pbar_stack)
         elif episode_id is not None:
-            download_episode(episode_id, pbar_stack)
+            download_episode(episode_id, pbar_stack=pbar_stack)
         elif show_id is not None:
             download_show(show_id, pbar_stack)
         elif artist_id is not None:
@@ -4,13 +4,18 @@ import json
 import base64
 import sys
 import re
+import dbm
+import pickle
+import shelve
 import requests
+from functools import lru_cache
 from librespot.audio.decoders import VorbisOnlyAudioQuality
 from librespot.core import Session, OAuth
 from librespot.mercury import MercuryRequests
 from librespot.proto.Authentication_pb2 import AuthenticationType
 from pathlib import Path, PurePath
-from time import sleep
+from threading import Lock, current_thread, main_thread
+from time import sleep, time
 from typing import Any, Callable
 
 from zotify.const import *
@@ -125,9 +130,15 @@ DEPRECIATED_CONFIGS = {
 }
 
 
+@lru_cache(maxsize=8)
+def compile_regex(pattern: str) -> re.Pattern:
+    return re.compile(pattern, re.I)
+
+
 class Config:
     Values = {}
     logger = None
+    api_cache_location: Path | None = None
     
     @classmethod
     def load(cls, args) -> None:
@@ -145,7 +156,9 @@ class Config:
             if config_fp.is_dir():
                 config_fp = config_fp / 'config.json'
         full_config_path = Path(config_fp).expanduser()
+        cls.api_cache_location = full_config_path.parent / 'api_cache'
         
+        Printer.sync_channels() # channels are read live until loading is done
         cls.Values = {}
         
         # Debug Check (guarantee at top of config)
@@ -202,7 +215,7 @@ class Config:
             # for logger in mutedLoggers:
             #     logging.getLogger(logger).disabled = True
         
-        # Confirm regex patterns
+        # Confirm (and precompile) regex patterns
         if cls.get_regex_enabled():
             for mode in ["Track", "Episode", "Album"]:
                 regex_method: Callable[[None], None | re.Pattern] = getattr(cls, f"get_regex_{mode.lower()}")
@@ -211,6 +224,8 @@ class Config:
         # Check no-splash
         if args.no_splash:
             cls.Values[PRINT_SPLASH] = False
+        
+        Printer.sync_channels(cls)
     
     @classmethod
     def get_default_json(cls) -> dict:
@@ -547,19 +562,19 @@ class Config:
     def get_regex_album(cls) -> None | re.Pattern:
         if not (cls.get_regex_enabled() and cls.get(REGEX_ALBUM_SKIP)):
             return None
-        return re.compile(cls.get(REGEX_ALBUM_SKIP), re.I)
+        return compile_regex(cls.get(REGEX_ALBUM_SKIP))
     
     @classmethod
     def get_regex_track(cls) -> None | re.Pattern:
         if not (cls.get_regex_enabled() and cls.get(REGEX_TRACK_SKIP)):
             return None
-        return re.compile(cls.get(REGEX_TRACK_SKIP), re.I)
+        return compile_regex(cls.get(REGEX_TRACK_SKIP))
  
     @classmethod
     def get_regex_episode(cls) -> None | re.Pattern:
         if not (cls.get_regex_enabled() and cls.get(REGEX_EPISODE_SKIP)):
             return None
-        return re.compile(cls.get(REGEX_EPISODE_SKIP), re.I)
+        return compile_regex(cls.get(REGEX_EPISODE_SKIP))
     
     @classmethod
     def get_lyrics_header(cls) -> bool:
@@ -570,10 +585,16 @@ class Config:
         return cls.get(STRICT_LIBRARY_VERIFY)
 
 
+API_CACHE_ERRORS = (*dbm.error, OSError, pickle.UnpicklingError, EOFError)
+
+
 class Zotify:    
     SESSION: Session = None
     DOWNLOAD_QUALITY = None
     TOTAL_API_CALLS = 0
+    API_CALLS_LOCK = Lock()
+    AUTH_TOKEN_LOCK = Lock()
+    API_CACHE_LOCK = Lock()
     DATETIME_LAUNCH = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     CONFIG: Config = Config()
     
@@ -640,8 +661,10 @@ class Zotify:
     
     @classmethod
     def get_auth_header(cls):
+        with cls.AUTH_TOKEN_LOCK: # librespot's token provider isn't safe to refresh from several threads
+            token = cls.__get_auth_token()
         return {
-            'Authorization': f'Bearer {cls.__get_auth_token()}',
+            'Authorization': f'Bearer {token}',
             'Accept-Language': f'{cls.CONFIG.get_language()}',
             'Accept': 'application/json',
             'app-platform': 'WebPlayer',
@@ -651,11 +674,14 @@ class Zotify:
     @classmethod
     def invoke_url(cls, url: str, _params: dict | None = None, expectFail: bool = False) -> tuple[str, dict]:
         headers = cls.get_auth_header()
+        # prefetch workers must not pause/resume the main thread's loader
+        skip_toggle = current_thread() is not main_thread()
         
         tryCount = 0
         while tryCount <= cls.CONFIG.get_retry_attempts():
             response = requests.get(url, headers=headers, params=_params)
-            cls.TOTAL_API_CALLS += 1
+            with cls.API_CALLS_LOCK:
+                cls.TOTAL_API_CALLS += 1
             
             try:
                 responsetext = response.text
@@ -669,8 +695,17 @@ class Zotify:
             if not responsejson or 'error' in responsejson:
                 if not expectFail: 
                     Printer.hashtaged(PrintChannel.WARNING, f'API ERROR (TRY {tryCount}) - RETRYING\n' +\
-                                                            f'{responsejson["error"]["status"]}: {responsejson["error"]["message"]}')
-                sleep(5 if not expectFail else 1)
+                                                            f'{responsejson["error"]["status"]}: {responsejson["error"]["message"]}',
+                                      skip_toggle)
+                retry_after = response.headers.get('Retry-After', '')
+                if response.status_code == 429 and retry_after.isdigit():
+                    # honor the requested backoff, within reason
+                    wait = min(int(retry_after), RETRY_AFTER_MAX)
+                    Printer.hashtaged(PrintChannel.WARNING, f'RATE LIMITED - WAITING {wait}s BEFORE RETRYING\n' +\
+                                                            f'Retry-After: {retry_after}s', skip_toggle)
+                    sleep(wait)
+                else:
+                    sleep(5 if not expectFail else 1)
                 tryCount += 1
                 continue
             else:
@@ -678,10 +713,58 @@ class Zotify:
         
         if not expectFail:
             Printer.hashtaged(PrintChannel.API_ERROR, f'API ERROR (TRY {tryCount}) - RETRY LIMIT EXCEDED\n' +\
-                                                      f'{responsejson["error"]["status"]}: {responsejson["error"]["message"]}')
+                                                      f'{responsejson["error"]["status"]}: {responsejson["error"]["message"]}',
+                              skip_toggle)
         
         return responsetext, responsejson
     
+    @classmethod
+    def invoke_url_cached(cls, url: str, expire: int = API_CACHE_EXPIRE) -> dict:
+        """ Serves exact-match responses from a disk-backed cache, falling back to invoke_url """
+        cache_location = cls.CONFIG.api_cache_location
+        if cache_location is None:
+            return cls.invoke_url(url)[1]
+        
+        try:
+            with cls.API_CACHE_LOCK, shelve.open(str(cache_location)) as cache:
+                entry: tuple[float, dict] | None = cache.get(url)
+        except API_CACHE_ERRORS: # locked by another zotify process, or corrupt
+            return cls.invoke_url(url)[1]
+        if entry is not None and time() - entry[0] < expire and ERROR not in entry[1]:
+            return entry[1]
+        
+        _, responsejson = cls.invoke_url(url)
+        try:
+            with cls.API_CACHE_LOCK, shelve.open(str(cache_location)) as cache:
+                if responsejson and ERROR not in responsejson:
+                    cache[url] = (time(), responsejson)
+                    if len(cache) > API_CACHE_MAX_ENTRIES:
+                        cls.prune_api_cache(cache, expire)
+                elif url in cache:
+                    del cache[url]
+        except API_CACHE_ERRORS:
+            pass # the response is still good, it just won't be cached
+        return responsejson
+    
+    @staticmethod
+    def prune_api_cache(cache: shelve.Shelf, expire: int) -> None:
+        """ Drops expired entries, then the oldest ones, until the cache is back to 3/4 of its cap """
+        now = time()
+        stamps = {}
+        for key in list(cache.keys()):
+            try:
+                stamps[key] = cache[key][0]
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                stamps[key] = 0.0 # unreadable, treat as expired
+        expired = [key for key, stamp in stamps.items() if now - stamp >= expire]
+        for key in expired:
+            del cache[key]
+            del stamps[key]
+        overflow = len(stamps) - API_CACHE_MAX_ENTRIES * 3 // 4
+        if overflow > 0:
+            for key in sorted(stamps, key=stamps.get)[:overflow]:
+                del cache[key]
+    
     @classmethod
     def invoke_url_with_params(cls, url, limit, offset, **kwargs):
         params = {LIMIT: limit, OFFSET: offset}
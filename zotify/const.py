@@ -144,6 +144,13 @@ SCOPES = [
     "user-top-read",
 ]
 
+# API Cache
+API_CACHE_EXPIRE = 86400 # seconds
+API_CACHE_MAX_ENTRIES = 4096
+
+# API Rate Limiting
+RETRY_AFTER_MAX = 60 # seconds, Spotify has been seen asking for hours
+
 # System Constants
 LINUX_SYSTEM = 'Linux'
 WINDOWS_SYSTEM = 'Windows'
@@ -167,6 +174,7 @@ EXT_MAP = {
     'vorbis': 'ogg',
     'copy': 'ogg'
 }
+AUDIO_EXTENSIONS = frozenset(EXT_MAP.values())
 
 # Config Keys
 MANDATORY = 'MANDATORY'
@@ -1,13 +1,20 @@
+import io
+import os
+import re
 import time
-import ffmpy
-import subprocess
+import shutil
+import requests
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import PurePath, Path
 from librespot.metadata import EpisodeId
+from requests.adapters import HTTPAdapter
+from tqdm.utils import CallbackIOWrapper
+from urllib3.util.retry import Retry
 
 from zotify.config import Zotify
 from zotify.const import (
     EPISODE_URL, SHOW_URL, PARTNER_URL, PERSISTED_QUERY, ERROR, ID, ITEMS, NAME,
-    SHOW, DURATION_MS, EXT_MAP, IMAGES, URL, WIDTH, RELEASE_DATE, DESCRIPTION,
+    SHOW, DURATION_MS, EXT_MAP, AUDIO_EXTENSIONS, IMAGES, URL, WIDTH, RELEASE_DATE, DESCRIPTION,
     HTML_DESCRIPTION, YEAR, IMAGE_URL
 )
 from zotify.termoutput import PrintChannel, Printer, Loader
@@ -17,6 +24,38 @@ from zotify.utils import (
 )
 
 
+PREFETCH_WINDOW = 8
+PREFETCH_POOL = ThreadPoolExecutor(max_workers=PREFETCH_WINDOW, thread_name_prefix="zotify-prefetch")
+
+# pooled keep-alive connections for directly hosted episodes, retrying transient and rate limit errors
+# (once retries run out the last response is returned rather than raised, so callers' status checks still apply)
+DIRECT_SESSION = requests.Session()
+DIRECT_ADAPTER = HTTPAdapter(pool_connections=8, pool_maxsize=16,
+                             max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                                               respect_retry_after_header=True, raise_on_status=False))
+DIRECT_SESSION.mount('https://', DIRECT_ADAPTER)
+DIRECT_SESSION.mount('http://', DIRECT_ADAPTER)
+
+# podcasts are read sequentially, so favor larger reads than CHUNK_SIZE's track oriented default
+PODCAST_CHUNK_SIZE = 256 * 1024
+RANGED_DOWNLOAD_PARTS = 4
+RANGED_DOWNLOAD_MIN_SIZE = 4 * 1024 * 1024
+
+# podcast folder -> {file stem: paths} of episodes already on disk, dropped whenever the folder is written to
+EXISTING_EPISODES: dict[Path, dict[str, list[Path]]] = {}
+
+# (offset, signature, extension) of the containers Spotify and podcast hosts serve
+AUDIO_MAGIC = (
+    (0, b'OggS', 'ogg'),
+    (0, b'fLaC', 'flac'),
+    (0, b'ID3', 'mp3'),
+    (0, b'\xff\xfb', 'mp3'),
+    (0, b'\xff\xf3', 'mp3'),
+    (0, b'\xff\xf2', 'mp3'),
+    (4, b'ftyp', 'm4a'),
+)
+
+
 def parse_episode_metadata(episode_resp: dict) -> dict:
     """ Parses the API response for an episode into a structured dictionary. """
     episode_metadata = {}
@@ -26,12 +65,18 @@ def parse_episode_metadata(episode_resp: dict) -> dict:
     episode_metadata[SHOW] = episode_resp[SHOW][NAME]
     episode_metadata[DURATION_MS] = episode_resp[DURATION_MS]
     episode_metadata[RELEASE_DATE] = episode_resp[RELEASE_DATE]
-    episode_metadata[YEAR] = episode_metadata[RELEASE_DATE].split('-')[0]
+    episode_metadata[YEAR] = episode_metadata[RELEASE_DATE].partition('-')[0]
     
     # Use description, fallback to html_description if it exists
     episode_metadata[DESCRIPTION] = episode_resp.get(DESCRIPTION, episode_resp.get(HTML_DESCRIPTION, ''))
 
-    largest_image = max(episode_resp[IMAGES], key=lambda img: img[WIDTH], default=None)
+    largest_image = None
+    largest_width = -1
+    for image in episode_resp[IMAGES]:
+        width = image.get(WIDTH) or 0
+        if width > largest_width:
+            largest_width = width
+            largest_image = image
     episode_metadata[IMAGE_URL] = largest_image[URL] if largest_image else ''
 
     episode_metadata['album'] = episode_metadata[SHOW]
@@ -40,10 +85,16 @@ def parse_episode_metadata(episode_resp: dict) -> dict:
     return episode_metadata
 
 
-def get_episode_metadata(episode_id: str) -> dict | None:
-    """ Retrieves and parses metadata for a podcast episode. """
+def get_episode_metadata(episode_id: str, prefetched: dict | None = None) -> dict | None:
+    """ Retrieves and parses metadata for a podcast episode, reusing a prefetched API object if given. """
+    if prefetched is not None and SHOW in prefetched:
+        try:
+            return parse_episode_metadata(prefetched)
+        except Exception as e:
+            Printer.debug(f'Failed to parse prefetched episode, refetching: {str(e)}')
+    
     with Loader(PrintChannel.PROGRESS_INFO, "Fetching episode information..."):
-        (raw, resp) = Zotify.invoke_url(f'{EPISODE_URL}/{episode_id}')
+        resp = Zotify.invoke_url_cached(f'{EPISODE_URL}/{episode_id}')
 
     if not resp or ERROR in resp:
         Printer.hashtaged(PrintChannel.ERROR, 'INVALID EPISODE ID OR FAILED TO FETCH METADATA')
@@ -56,28 +107,140 @@ def get_episode_metadata(episode_id: str) -> dict | None:
         return None
 
 
-def get_show_episode_ids(show_id: str) -> list:
-    with Loader(PrintChannel.PROGRESS_INFO, "Fetching episodes..."):
-        episodes = Zotify.invoke_url_nextable(f'{SHOW_URL}/{show_id}/episodes', ITEMS)
-    return [episode[ID] for episode in episodes]
+def open_raw_writer(path: Path) -> io.BufferedWriter:
+    """ Opens path for binary writing, skipping access time updates where the OS allows it """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    try:
+        fd = os.open(path, flags | getattr(os, 'O_NOATIME', 0), 0o644)
+    except PermissionError:
+        # O_NOATIME is refused on files owned by another user
+        fd = os.open(path, flags, 0o644)
+    # BufferedWriter retries short raw writes, and passes chunks larger than its buffer straight through
+    return io.BufferedWriter(io.FileIO(fd, 'w', closefd=True))
+
+
+def sniff_audio_suffix(path: str | PurePath) -> str | None:
+    """ Identifies a downloaded file's extension from its leading magic bytes, None if unrecognized """
+    with open(path, 'rb') as f:
+        magic = f.read(16)
+    
+    for offset, signature, suffix in AUDIO_MAGIC:
+        if magic.startswith(signature, offset):
+            return suffix
+    return None
+
+
+def get_existing_episode(episode_path: Path) -> tuple[Path, int] | None:
+    """ Finds the largest episode (and its size) already saved with any known audio extension, from a cached listing of its folder """
+    podcast_dir = episode_path.parent
+    if podcast_dir not in EXISTING_EPISODES:
+        listing: dict[str, list[Path]] = {}
+        for p in podcast_dir.iterdir():
+            if p.suffix.lstrip('.') in AUDIO_EXTENSIONS:
+                listing.setdefault(p.stem, []).append(p)
+        EXISTING_EPISODES[podcast_dir] = listing
+    
+    # the same episode may be saved under several extensions, any of them can satisfy the size check
+    largest = None
+    for p in EXISTING_EPISODES[podcast_dir].get(episode_path.stem, ()):
+        try:
+            size = p.stat().st_size
+        except FileNotFoundError: # removed since the folder was listed
+            continue
+        if largest is None or size > largest[1]:
+            largest = (p, size)
+    return largest
+
 
+def match_episode_regex(episode_name: str) -> re.Match | None:
+    """ Matches an episode's name against the episode regex filter, None if unfiltered """
+    regex_episode = Zotify.CONFIG.get_regex_episode()
+    return regex_episode.search(fix_filename(episode_name)) if regex_episode else None
 
-def download_podcast_directly(url, filename):
+
+def get_episode_partner_resp(episode_id: str) -> dict:
+    """ Retrieves the partner API response holding an episode's audio source URLs """
+    return Zotify.invoke_url_cached(PARTNER_URL + episode_id + '"}&extensions=' + PERSISTED_QUERY)
+
+
+def get_show_episodes(show_id: str) -> list[dict]:
+    """ Retrieves the full episode objects of a show, paginated in bulk """
+    with Loader(PrintChannel.PROGRESS_INFO, "Fetching episodes..."):
+        (raw, show) = Zotify.invoke_url(f'{SHOW_URL}/{show_id}')
+        episodes = Zotify.invoke_url_nextable(f'{SHOW_URL}/{show_id}/episodes', ITEMS)
+    
+    # simplified episode objects omit their parent show, graft it back on for parse_episode_metadata
+    if show and ERROR not in show:
+        show_stub = {ID: show_id, NAME: show[NAME]}
+        for episode in episodes:
+            if episode: episode[SHOW] = show_stub
+    return [episode for episode in episodes if episode]
+
+
+def copy_stream_real_time(reader, writer, total_size: int, duration_ms: int, chunk_size: int, min_sleep: float = 0.05) -> None:
+    """ shutil.copyfileobj variant that paces the copy to the episode's real playback time """
+    rate = total_size / (duration_ms/1000) if duration_ms else 0 # bytes per second of playback
+    time_start = time.monotonic()
+    downloaded = 0
+    while True:
+        data = reader.read(chunk_size)
+        if not data:
+            break
+        writer.write(data)
+        downloaded += len(data)
+        if rate:
+            # only sleep once far enough ahead of schedule, batching many chunks into one sleep
+            lag = downloaded / rate - (time.monotonic() - time_start)
+            if lag > min_sleep:
+                time.sleep(lag)
+
+
+def download_podcast_range(url: str, path: Path, start: int, end: int, pbar) -> bool:
+    """ Writes bytes start-end (inclusive) of url into path at the same offset, False if the range wasn't served in full """
+    r = DIRECT_SESSION.get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True)
+    # a server may clamp or shift the range it actually serves, which would leave a gap in the file
+    served = r.headers.get('Content-Range', '').removeprefix('bytes ').partition('/')[0]
+    if r.status_code != 206 or served != f"{start}-{end}":
+        r.close()
+        return False
+    written = 0
+    with r, path.open("r+b") as f:
+        f.seek(start)
+        for data in r.iter_content(PODCAST_CHUNK_SIZE):
+            written += f.write(data)
+            pbar.update(len(data))
+    return written == end - start + 1
+
+
+def download_podcast_directly(url, filename, parts: int = RANGED_DOWNLOAD_PARTS):
     import functools
-    import shutil
-    import requests
     from tqdm.auto import tqdm
 
-    r = requests.get(url, stream=True, allow_redirects=True)
+    path = Path(filename).expanduser().resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # split large files served with byte range support across parallel requests
+    head = DIRECT_SESSION.head(url, allow_redirects=True)
+    file_size = int(head.headers.get('Content-Length', 0))
+    if head.ok and head.headers.get('Accept-Ranges') == 'bytes' and file_size >= RANGED_DOWNLOAD_MIN_SIZE:
+        part_size = -(-file_size // parts)
+        bounds = [(start, min(start + part_size, file_size) - 1) for start in range(0, file_size, part_size)]
+        with path.open("wb") as f:
+            f.truncate(file_size)
+        with tqdm(total=file_size, unit='B', unit_scale=True, unit_divisor=1024) as pbar, \
+             ThreadPoolExecutor(max_workers=len(bounds)) as executor:
+            ranged = executor.map(lambda b: download_podcast_range(head.url, path, *b, pbar), bounds)
+            if all(list(ranged)):
+                return path
+        # server ignored the Range header, fall back to a single stream
+
+    r = DIRECT_SESSION.get(url, stream=True, allow_redirects=True)
     if r.status_code != 200:
         r.raise_for_status()
         raise RuntimeError(
             f"Request to {url} returned status code {r.status_code}")
     file_size = int(r.headers.get('Content-Length', 0))
 
-    path = Path(filename).expanduser().resolve()
-    path.parent.mkdir(parents=True, exist_ok=True)
-
     desc = "(Unknown total file size)" if file_size == 0 else ""
     r.raw.read = functools.partial(
         r.raw.read, decode_content=True)  # Decompress if needed
@@ -89,22 +252,29 @@ def download_podcast_directly(url, filename):
 
 
 def download_show(show_id, pbar_stack: list | None = None):
-    episode_ids = get_show_episode_ids(show_id)
+    episodes = get_show_episodes(show_id)
 
     pos, pbar_stack = Printer.pbar_position_handler(3, pbar_stack)
-    pbar = Printer.pbar(episode_ids, unit='episode', pos=pos,
+    pbar = Printer.pbar(episodes, unit='episode', pos=pos,
                         disable=not Zotify.CONFIG.get_show_playlist_pbar())
     pbar_stack.append(pbar)
 
-    for episode in pbar:
-        resp = Zotify.invoke_url(f'{EPISODE_URL}/{episode_id}', raw=True)
-        pbar.set_description(resp.get(NAME, "Loading..."))
-        download_episode(episode, pbar_stack)
+    partner_resps: dict[str, Future] = {}
+    for i, episode in enumerate(pbar):
+        # keep a sliding window of partner lookups in flight ahead of the current episode,
+        # leaving out episodes the regex filter will skip anyway
+        for upcoming in episodes[i:i + PREFETCH_WINDOW]:
+            if upcoming[ID] not in partner_resps and not match_episode_regex(upcoming.get(NAME, "")):
+                partner_resps[upcoming[ID]] = PREFETCH_POOL.submit(get_episode_partner_resp, upcoming[ID])
+        
+        pbar.set_description(episode.get(NAME, "Loading..."))
+        download_episode(episode[ID], episode, pbar_stack, partner_resps.get(episode[ID]))
         Printer.refresh_all_pbars(pbar_stack)
 
 
-def download_episode(episode_id, pbar_stack: list | None = None) -> None:
-    episode_metadata = get_episode_metadata(episode_id)
+def download_episode(episode_id, prefetched: dict | None = None, pbar_stack: list | None = None,
+                     partner_resp: Future | None = None) -> None:
+    episode_metadata = get_episode_metadata(episode_id, prefetched)
 
     if not episode_metadata:
         Printer.hashtaged(PrintChannel.ERROR, 'SKIPPING EPISODE - FAILED TO QUERY METADATA\n' +\
@@ -116,20 +286,26 @@ def download_episode(episode_id, pbar_stack: list | None = None) -> None:
     episode_name = fix_filename(episode_metadata[NAME])
     duration_ms = episode_metadata[DURATION_MS]
 
-    if Zotify.CONFIG.get_regex_episode():
-        regex_match = Zotify.CONFIG.get_regex_episode().search(episode_name)
-        if regex_match:
-            Printer.hashtaged(PrintChannel.SKIPPING, 'EPISODE MATCHES REGEX FILTER\n' +\
-                                                    f'Episode_Name: {episode_name} - Episode_ID: {episode_id}\n'+\
-                                                   (f'Regex Groups: {regex_match.groupdict()}' if regex_match.groups() else ""))
-            wait_between_downloads(); return
+    regex_match = match_episode_regex(episode_metadata[NAME])
+    if regex_match:
+        Printer.hashtaged(PrintChannel.SKIPPING, 'EPISODE MATCHES REGEX FILTER\n' +\
+                                                f'Episode_Name: {episode_name} - Episode_ID: {episode_id}\n'+\
+                                               (f'Regex Groups: {regex_match.groupdict()}' if regex_match.groups() else ""))
+        wait_between_downloads(); return
 
     with Loader(PrintChannel.PROGRESS_INFO, "Preparing download..."):
         filename = f"{podcast_name} - {episode_name}"
-        episode_path = PurePath(Zotify.CONFIG.get_root_podcast_path()) / podcast_name / f"{filename}"
+        episode_path = Path(Zotify.CONFIG.get_root_podcast_path()) / podcast_name / f"{filename}"
         create_download_directory(episode_path.parent)
 
-        (raw, resp) = Zotify.invoke_url(PARTNER_URL + episode_id + '"}&extensions=' + PERSISTED_QUERY)
+        resp = None
+        if partner_resp is not None:
+            try:
+                resp = partner_resp.result()
+            except Exception as e:
+                Printer.debug(f"Prefetched partner lookup failed, retrying in place: {e!r}")
+        if resp is None:
+            resp = get_episode_partner_resp(episode_id)
         direct_download_url = resp["data"]["episode"]["audio"]["items"][-1]["url"]
 
         if "anon-podcast.scdn.co" in direct_download_url or "audio_preview_url" not in resp:
@@ -141,25 +317,22 @@ def download_episode(episode_id, pbar_stack: list | None = None) -> None:
                                                      f'Episode_ID: {str(episode_id)}')
                 wait_between_downloads(); return
 
-            episode_exists_on_filesystem = False
             total_size: int = stream.input_stream.size
-            for extension_list_item in set(EXT_MAP.values()):
-                test_episode_path = Path(episode_path).with_suffix("." + extension_list_item)
-                if test_episode_path.is_file():
-                    Printer.debug(f"FILE EXISTS: {test_episode_path}")
-                    Printer.debug(f"FILE SIZE: {test_episode_path.stat().st_size } STREAM SIZE: {total_size}")                    
-                    if test_episode_path.stat().st_size >= (total_size - 1024) and Zotify.CONFIG.get_skip_existing(): # Final file sizes can be slightly smaller than reported stream size.  Check that it's within a kilobyte
-                        Printer.hashtaged(PrintChannel.SKIPPING, f'"{podcast_name} - {episode_name}" (EPISODE ALREADY EXISTS)')
-                        episode_exists_on_filesystem = True
-                        break
-            if episode_exists_on_filesystem == True:
-                wait_between_downloads(); return
-
-            episode_path = Path(episode_path).with_suffix(".tmp")            
+            existing_episode = get_existing_episode(episode_path)
+            if existing_episode is not None:
+                existing_episode_path, existing_size = existing_episode
+                Printer.debug(f"FILE EXISTS: {existing_episode_path}")
+                Printer.debug(f"FILE SIZE: {existing_size} STREAM SIZE: {total_size}")
+                if existing_size >= (total_size - 1024) and Zotify.CONFIG.get_skip_existing(): # Final file sizes can be slightly smaller than reported stream size.  Check that it's within a kilobyte
+                    Printer.hashtaged(PrintChannel.SKIPPING, f'"{podcast_name} - {episode_name}" (EPISODE ALREADY EXISTS)')
+                    wait_between_downloads(); return
+
+            episode_path = episode_path.with_suffix(".tmp")
             time_start = time.time()
-            downloaded = 0
+            reader = stream.input_stream.stream()
+            chunk_size = max(Zotify.CONFIG.get_chunk_size(), PODCAST_CHUNK_SIZE)
             pos, pbar_stack = Printer.pbar_position_handler(1, pbar_stack)
-            with open(episode_path, 'wb') as file, Printer.pbar(
+            with open_raw_writer(episode_path) as file, Printer.pbar(
                 desc=filename,
                 total=total_size,
                 unit='B',
@@ -168,17 +341,11 @@ def download_episode(episode_id, pbar_stack: list | None = None) -> None:
                 disable=not Zotify.CONFIG.get_show_download_pbar(),
                 pos=pos
             ) as pbar:
-                b = 0
-                while b < 5:
-                    data = stream.input_stream.stream().read(Zotify.CONFIG.get_chunk_size())
-                    pbar.update(file.write(data))
-                    downloaded += len(data)
-                    b += 1 if data == b'' else 0
-                    if Zotify.CONFIG.get_download_real_time():
-                        delta_real = time.time() - time_start
-                        delta_want = (downloaded / total_size) * (int(duration_ms)/1000)
-                        if delta_want > delta_real:
-                            time.sleep(delta_want - delta_real)
+                writer = CallbackIOWrapper(pbar.update, file, "write")
+                if Zotify.CONFIG.get_download_real_time():
+                    copy_stream_real_time(reader, writer, total_size, int(duration_ms), chunk_size)
+                else:
+                    shutil.copyfileobj(reader, writer, chunk_size)
 
             time_dl_end = time.time()
             time_elapsed_dl = fmt_duration(time_dl_end - time_start)
@@ -191,46 +358,45 @@ def download_episode(episode_id, pbar_stack: list | None = None) -> None:
     Printer.hashtaged(PrintChannel.DOWNLOADS, f'DOWNLOADED: "{filename}"\n' +\
                                               f'DOWNLOAD TOOK {time_elapsed_dl}')
 
-    episode_path_codec = None
-    try:
-        with Loader(PrintChannel.PROGRESS_INFO, "Identifying episode audio codec..."):
-            ff_m = ffmpy.FFprobe(
-                global_options=['-hide_banner', f'-loglevel {Zotify.CONFIG.get_ffmpeg_log_level()}'],
-                inputs={episode_path: ["-show_entries", "stream=codec_name"]},
-            )
-            stdout, _ = ff_m.run(stdout=subprocess.PIPE)
-            codec = stdout.decode().strip().split("=")[1].split("\r")[0].split("\n")[0]
-
-            if codec in EXT_MAP:
-                suffix = EXT_MAP[codec]
-            else:
-                suffix = codec
-
-            episode_path_codec = episode_path.with_suffix(f".{suffix}")
-            if Path(episode_path_codec).exists():
-                Path(episode_path_codec).unlink()
-            Path(episode_path).rename(episode_path_codec)
-
-        Printer.debug(f"Detected Codec: {codec}\n" +\
-                      f"File Renamed: {episode_path_codec.name}")
-
-    except ffmpy.FFExecutableNotFoundError:
-        episode_path_codec = episode_path.with_suffix(".mp3")
-        Path(episode_path).rename(episode_path_codec)
-        Printer.hashtaged(PrintChannel.WARNING, 'FFMPEG NOT FOUND\n' +\
-                                                'SKIPPING CODEC ANALYSIS - OUTPUT ASSUMED MP3')
-
-    if episode_path_codec and episode_path_codec.exists():
+    suffix = sniff_audio_suffix(episode_path)
+    if suffix is not None:
+        Printer.debug(f"Detected Container: {suffix}")
+    else:
+        import ffmpy
+        import subprocess
         try:
-            with Loader(PrintChannel.PROGRESS_INFO, "Applying metadata..."):
-                # For podcasts, genre isn't provided, so we'll just set it to "Podcast"
-                genres = ["Podcast"]
-                set_podcast_tags(episode_path_codec, episode_metadata, genres=genres)
-                if episode_metadata[IMAGE_URL]:
-                    set_music_thumbnail(episode_path_codec, episode_metadata[IMAGE_URL], mode="podcast")
-        except Exception as e:
-            Printer.hashtaged(PrintChannel.ERROR, 'FAILED TO WRITE METADATA\n' + \
-                                                  'Ensure FFMPEG is installed and added to your PATH')
-            Printer.traceback(e)
+            with Loader(PrintChannel.PROGRESS_INFO, "Identifying episode audio codec..."):
+                ff_m = ffmpy.FFprobe(
+                    global_options=['-hide_banner', f'-loglevel {Zotify.CONFIG.get_ffmpeg_log_level()}'],
+                    inputs={episode_path: ["-show_entries", "stream=codec_name"]},
+                )
+                stdout, _ = ff_m.run(stdout=subprocess.PIPE)
+                codec = stdout.decode().strip().split("=")[1].split("\r")[0].split("\n")[0]
+                suffix = EXT_MAP.get(codec, codec)
+            
+            Printer.debug(f"Detected Codec: {codec}")
+        
+        except ffmpy.FFExecutableNotFoundError:
+            suffix = "mp3"
+            Printer.hashtaged(PrintChannel.WARNING, 'FFMPEG NOT FOUND\n' +\
+                                                    'SKIPPING CODEC ANALYSIS - OUTPUT ASSUMED MP3')
+    
+    # os.replace overwrites any previous download atomically
+    episode_path_codec = episode_path.with_suffix(f".{suffix}")
+    os.replace(episode_path, episode_path_codec)
+    EXISTING_EPISODES.pop(episode_path_codec.parent, None)
+    Printer.debug(f"File Renamed: {episode_path_codec.name}")
+
+    try:
+        with Loader(PrintChannel.PROGRESS_INFO, "Applying metadata..."):
+            # For podcasts, genre isn't provided, so we'll just set it to "Podcast"
+            genres = ["Podcast"]
+            set_podcast_tags(episode_path_codec, episode_metadata, genres=genres)
+            if episode_metadata[IMAGE_URL]:
+                set_music_thumbnail(episode_path_codec, episode_metadata[IMAGE_URL], mode="podcast")
+    except Exception as e:
+        Printer.hashtaged(PrintChannel.ERROR, 'FAILED TO WRITE METADATA\n' + \
+                                              'Ensure FFMPEG is installed and added to your PATH')
+        Printer.traceback(e)
 
     wait_between_downloads()
\ No newline at end of file
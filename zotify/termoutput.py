@@ -1,15 +1,13 @@
 from __future__ import annotations
 import platform
+import signal
 from os import get_terminal_size, system
-from itertools import cycle
-from time import sleep
+from itertools import cycle, islice
 from pprint import pformat
-from tabulate import tabulate
-from threading import Thread
-from traceback import TracebackException
+from threading import Event, Lock, Thread
+from traceback import format_exception
 from enum import Enum
 from tqdm import tqdm
-from mutagen import FileType
 
 from zotify.const import *
 import sys
@@ -65,15 +63,14 @@ class SimplePbar:
             f"| {elapsed:0.1f}s elapsed | ETA {eta:0.1f}s{self._postfix}"
         )
 
-        # if sys.stdout.isatty():
-        tqdm.write(line.ljust(Printer._term_cols()), end="\r")
-        # else:
-        #     tqdm.write(line)
+        if IS_TTY:
+            line = line.ljust(Printer._term_cols())
+        tqdm.write(line, end="\r")
 
     def close(self):
         if not self._done and not self.disable:
             line = f"{self.desc}: 100% | {self.total}/{self.total} {self.unit} | Done!"
-            if sys.stdout.isatty():
+            if IS_TTY:
                 tqdm.write(line.ljust(Printer._term_cols()))
             else:
                 tqdm.write(line)
@@ -99,6 +96,29 @@ RIGHT_ONE_COL = "\033[C"
 LEFT_ONE_COL = "\033[D"
 START_OF_PREV_LINE = "\033[F"
 CLEAR_LINE = "\033[K"
+CLEAR_SCREEN = "\033[2J\033[3J\033[H"
+
+HASHTAG_END = "   ###"
+HASHTAG_SEP = HASHTAG_END + "\n###   "
+
+IS_WINDOWS = platform.system() == WINDOWS_SYSTEM
+IS_TTY = sys.stdout is not None and sys.stdout.isatty()
+
+SPLASH_TEXT = (
+    "    ███████╗ ██████╗ ████████╗██╗███████╗██╗   ██╗\n"
+    "    ╚══███╔╝██╔═══██╗╚══██╔══╝██║██╔════╝╚██╗ ██╔╝\n"
+    "      ███╔╝ ██║   ██║   ██║   ██║█████╗   ╚████╔╝ \n"
+    "     ███╔╝  ██║   ██║   ██║   ██║██╔══╝    ╚██╔╝  \n"
+    "    ███████╗╚██████╔╝   ██║   ██║██║        ██║   \n"
+    "    ╚══════╝ ╚═════╝    ╚═╝   ╚═╝╚═╝        ╚═╝   \n"
+)
+
+SEARCH_SELECT_TEXT = (
+    "\n"
+    "> SELECT A DOWNLOAD OPTION BY ID\n"
+    "> SELECT A RANGE BY ADDING A DASH BETWEEN BOTH ID's\n"
+    "> OR PARTICULAR OPTIONS BY ADDING A COMMA BETWEEN ID's\n"
+)
 
 
 class PrintChannel(Enum):
@@ -126,110 +146,218 @@ class PrintCategory(Enum):
     DEBUG = "\nDEBUG\n"
 
 
+LOADER_CATEGORIES = frozenset({PrintCategory.LOADER, PrintCategory.LOADER_CYCLE})
+
+
+def _category_prefix(last: PrintCategory, category: PrintCategory) -> str:
+    if last is PrintCategory.DEBUG and category is PrintCategory.DEBUG:
+        return ""
+    elif last in LOADER_CATEGORIES and category is PrintCategory.LOADER:
+        return "\n" + PrintCategory.LOADER_CYCLE.value
+    elif last in LOADER_CATEGORIES and category not in LOADER_CATEGORIES:
+        return category.value.replace("\n", "", 1)
+    else:
+        return category.value
+
+
+# prefix for a print of `category` following a print of `last`, keyed (last, category)
+CATEGORY_PREFIXES = {(last, category): _category_prefix(last, category)
+                     for last in PrintCategory for category in PrintCategory}
+
+
+SHRINK_MAP = {
+    AVAIL_MARKETS: "LIST REMOVED FOR BREVITY",
+    IMAGES: "LIST REMOVED FOR BREVITY",
+    EXTERNAL_URLS: "URL REMOVED FOR BREVITY",
+    PREVIEW_URL: "URL REMOVED FOR BREVITY",
+    "_children": "SET REMOVED FOR BREVITY",
+    "metadata_block_picture": "BYTES REMOVED FOR BREVITY",
+    "APIC:0": "BYTES REMOVED FOR BREVITY",
+    "covr": "BYTES REMOVED FOR BREVITY",
+}
+
+
+HASHTAG_CHANNEL_PREFIXES = {channel: channel.name + ":  " for channel in
+                            (PrintChannel.WARNING, PrintChannel.ERROR, PrintChannel.API_ERROR, PrintChannel.SKIPPING)}
+
+
 LAST_PRINT: PrintCategory = PrintCategory.NONE
 ACTIVE_LOADER: Loader | None = None
 ACTIVE_PBARS: list[tqdm] = []
+ACTIVE_LOCK = Lock() # guards ACTIVE_LOADER and ACTIVE_PBARS across download threads
+
+
+ZOTIFY = None # zotify.config.Zotify, bound on first use to dodge the circular import
+ENABLED_CHANNELS: dict[PrintChannel, bool] | None = None # snapshot of CONFIG, taken once Config.load finishes
+TERM_COLS: int | None = None
+TERM_COLS_STAMP = 0.0 # when TERM_COLS was measured, for platforms that never signal a resize
+TERM_COLS_TTL = 1.0
+JSON_RULES: tuple[int, str, str] | None = None # (columns, header, footer) framing JSON dumps
+
+
+def _reset_term_cols(signum=None, frame=None) -> None:
+    global TERM_COLS
+    TERM_COLS = None
+
+
+RESIZE_SIGNALLED = False
+if hasattr(signal, "SIGWINCH"):
+    try:
+        signal.signal(signal.SIGWINCH, _reset_term_cols)
+        RESIZE_SIGNALLED = True
+    except ValueError: # handlers can only be installed from the main thread
+        pass
 
 
 class Printer:
     @staticmethod
     def _term_cols() -> int:
-        try:
-            columns, _ = get_terminal_size()
-        except OSError:
-            columns = 80
-        return columns
+        """ Terminal width, cached until the terminal reports a resize (or briefly, where it can't) """
+        global TERM_COLS, TERM_COLS_STAMP
+        if TERM_COLS is not None and not RESIZE_SIGNALLED and time.monotonic() - TERM_COLS_STAMP > TERM_COLS_TTL:
+            TERM_COLS = None
+        if TERM_COLS is None:
+            try:
+                TERM_COLS, _ = get_terminal_size()
+            except OSError:
+                TERM_COLS = 80
+            TERM_COLS_STAMP = time.monotonic()
+        return TERM_COLS
+
+    @staticmethod
+    def _json_rules() -> tuple[str, str]:
+        """ Hash rules framing JSON dumps, rebuilt only when the terminal width changes """
+        global JSON_RULES
+        columns = Printer._term_cols()
+        if JSON_RULES is None or JSON_RULES[0] != columns:
+            JSON_RULES = (columns, "#" * (columns-1) + "\n", "\n" + "#" * columns)
+        return JSON_RULES[1], JSON_RULES[2]
+
+    @staticmethod
+    def _shrink_pair(pair: tuple) -> tuple:
+        if len(pair) == 2 and isinstance(pair[0], str):
+            replacement = SHRINK_MAP.get(pair[0])
+            if replacement is not None:
+                return (pair[0], replacement)
+        return pair
 
     @staticmethod
     def _api_shrink(obj: list | tuple | dict) -> dict:
         """ Shrinks API objects to remove data unnecessary data for debugging """
-
-        def shrink(k: str) -> str:
-            if k in {AVAIL_MARKETS, IMAGES}:
-                return "LIST REMOVED FOR BREVITY"
-            elif k in {EXTERNAL_URLS, PREVIEW_URL}:
-                return "URL REMOVED FOR BREVITY"
-            elif k in {"_children"}:
-                return "SET REMOVED FOR BREVITY"
-            elif k in {"metadata_block_picture", "APIC:0", "covr"}:
-                return "BYTES REMOVED FOR BREVITY"
-            return None
-
-        if isinstance(obj, list) and len(obj) > 0:
-            obj = [Printer._api_shrink(item) for item in obj]
-
-        elif isinstance(obj, tuple):
-            if len(obj) == 2 and isinstance(obj[0], str):
-                if shrink(obj[0]):
-                    obj = (obj[0], shrink(obj[0]))
-
-        elif isinstance(obj, (dict, FileType)):
-            for k, v in obj.items():
-                if shrink(k):
-                    obj[k] = shrink(k)
-                else:
-                    obj[k] = Printer._api_shrink(v) 
+        if isinstance(obj, tuple):
+            return Printer._shrink_pair(obj)
+
+        from mutagen import FileType
+
+        # iterative walk, mutating containers in place
+        stack = [obj]
+        while stack:
+            cur = stack.pop()
+            if isinstance(cur, list):
+                for i, v in enumerate(cur):
+                    if isinstance(v, tuple):
+                        cur[i] = Printer._shrink_pair(v)
+                    elif isinstance(v, (dict, list, FileType)):
+                        stack.append(v)
+            elif isinstance(cur, (dict, FileType)):
+                for k, v in cur.items():
+                    replacement = SHRINK_MAP.get(k) if isinstance(k, str) else None
+                    if replacement is not None:
+                        cur[k] = replacement
+                    elif isinstance(v, tuple):
+                        cur[k] = Printer._shrink_pair(v)
+                    elif isinstance(v, (dict, list, FileType)):
+                        stack.append(v)
 
         return obj
 
     @staticmethod
     def _print_prefixes(msg: str, category: PrintCategory, channel: PrintChannel) -> tuple[str, PrintCategory]:
         if category is PrintCategory.HASHTAG:
-            if channel in {PrintChannel.WARNING, PrintChannel.ERROR, PrintChannel.API_ERROR,
-                           PrintChannel.SKIPPING,}:
-                msg = channel.name + ":  " + msg
-            msg =  msg.replace("\n", "   ###\n###   ") + "   ###"
+            prefix = HASHTAG_CHANNEL_PREFIXES.get(channel)
+            if prefix is not None:
+                msg = prefix + msg
+            if "\n" in msg:
+                msg = HASHTAG_SEP.join(msg.split("\n"))
+            msg += HASHTAG_END
             if channel is PrintChannel.DEBUG:
                 msg = category.value.replace("\n", "", 1) + msg
                 category = PrintCategory.DEBUG
         elif category is PrintCategory.JSON:
-            msg = "#" * (Printer._term_cols()-1) + "\n" + msg + "\n" + "#" * Printer._term_cols()
+            header, footer = Printer._json_rules()
+            msg = header + msg + footer
 
-        global LAST_PRINT
-        if LAST_PRINT is PrintCategory.DEBUG and category is PrintCategory.DEBUG:
-            pass
-        elif LAST_PRINT in {PrintCategory.LOADER, PrintCategory.LOADER_CYCLE} and category is PrintCategory.LOADER:
-            msg = "\n" + PrintCategory.LOADER_CYCLE.value + msg
-        elif LAST_PRINT in {PrintCategory.LOADER, PrintCategory.LOADER_CYCLE} and "LOADER" not in category.name:
-            msg = category.value.replace("\n", "", 1) + msg
-        else:
-            msg = category.value + msg
-
-        return msg, category
+        return CATEGORY_PREFIXES[LAST_PRINT, category] + msg, category
 
     @staticmethod
     def _toggle_active_loader(skip_toggle: bool = False):
-        global ACTIVE_LOADER
-        if not skip_toggle and ACTIVE_LOADER:
-            if ACTIVE_LOADER.paused:
-                ACTIVE_LOADER.resume()
+        if skip_toggle:
+            return
+        with ACTIVE_LOCK:
+            loader = ACTIVE_LOADER
+        if loader:
+            if loader.paused:
+                loader.resume()
             else:
-                ACTIVE_LOADER.pause()
+                loader.pause()
+
+    @staticmethod
+    def _zotify():
+        global ZOTIFY
+        if ZOTIFY is None:
+            from zotify.config import Zotify
+            ZOTIFY = Zotify
+        return ZOTIFY
+
+    @staticmethod
+    def sync_channels(config=None) -> None:
+        """ Snapshot which channels `config` enables, or drop the snapshot while CONFIG is still being loaded """
+        global ENABLED_CHANNELS
+        if config is None:
+            ENABLED_CHANNELS = None
+        else:
+            ENABLED_CHANNELS = {c: c is PrintChannel.MANDATORY or bool(config.get(c.value)) for c in PrintChannel}
+
+    @staticmethod
+    def _channel_enabled(channel: PrintChannel) -> bool:
+        if ENABLED_CHANNELS is not None:
+            return ENABLED_CHANNELS[channel]
+        if channel is PrintChannel.MANDATORY:
+            return True
+        return bool(Printer._zotify().CONFIG.get(channel.value))
 
     @staticmethod
     def new_print(channel: PrintChannel, msg: str, category: PrintCategory = PrintCategory.NONE, skip_toggle: bool = False, end: str = "\n") -> None:
         global LAST_PRINT
-        if channel != PrintChannel.MANDATORY:
-            from zotify.config import Zotify
-        if channel == PrintChannel.MANDATORY or Zotify.CONFIG.get(channel.value):
-            msg, category = Printer._print_prefixes(msg, category, channel)
-            if channel == PrintChannel.DEBUG and Zotify.CONFIG.logger:
-                Zotify.CONFIG.logger.debug(msg.strip().replace("DEBUG", "\n") + "\n")
+        if Printer._channel_enabled(channel):
+            if category is not PrintCategory.NONE or LAST_PRINT in LOADER_CATEGORIES:
+                # plain prints straight after plain output need no prefix at all
+                msg, category = Printer._print_prefixes(msg, category, channel)
+            if channel == PrintChannel.DEBUG:
+                logger = Printer._zotify().CONFIG.logger
+                if logger:
+                    logger.debug(msg.strip().replace("DEBUG", "\n") + "\n")
             Printer._toggle_active_loader(skip_toggle)
-            for line in str(msg).splitlines():   
-                if end == "\n": 
-                    tqdm.write(line.ljust(Printer._term_cols()))
+            lines = str(msg).splitlines()
+            if lines:
+                # one write for the whole message, padding each line over any stale output on a terminal
+                if end == "\n" and IS_TTY:
+                    columns = Printer._term_cols()
+                    tqdm.write("\n".join(line.ljust(columns) for line in lines))
                 else:
-                    tqdm.write(line, end=end)
+                    tqdm.write("\n".join(lines), end=end)
                 LAST_PRINT = category
             Printer._toggle_active_loader(skip_toggle)
 
     @staticmethod
     def get_input(prompt: str) -> str:
-        user_input = ""
         Printer._toggle_active_loader()
+        Printer.new_print(PrintChannel.MANDATORY, prompt, PrintCategory.GENERAL, end="", skip_toggle=True)
+        user_input = str(input())
         while len(user_input) == 0:
-            Printer.new_print(PrintChannel.MANDATORY, prompt, PrintCategory.GENERAL, end="", skip_toggle=True)
+            # bare re-prompt, the formatted one is already on screen above
+            sys.stdout.write(prompt)
+            sys.stdout.flush()
             user_input = str(input())
         Printer._toggle_active_loader()
         return user_input
@@ -237,11 +365,15 @@ class Printer:
     # Print Wrappers
     @staticmethod
     def json_dump(obj: dict, channel: PrintChannel = PrintChannel.ERROR, category: PrintCategory = PrintCategory.JSON) -> None:
+        if not Printer._channel_enabled(channel):
+            return
         obj = Printer._api_shrink(obj)
         Printer.new_print(channel, pformat(obj, indent=2), category)
 
     @staticmethod
     def debug(*msg: tuple[str | object]) -> None:
+        if not Printer._channel_enabled(PrintChannel.DEBUG):
+            return
         for m in msg:
             if isinstance(m, str):
                 Printer.new_print(PrintChannel.DEBUG, m, PrintCategory.DEBUG)
@@ -249,12 +381,12 @@ class Printer:
                 Printer.json_dump(m, PrintChannel.DEBUG, PrintCategory.DEBUG)
 
     @staticmethod
-    def hashtaged(channel: PrintChannel, msg: str):
-        Printer.new_print(channel, msg, PrintCategory.HASHTAG)
+    def hashtaged(channel: PrintChannel, msg: str, skip_toggle: bool = False):
+        Printer.new_print(channel, msg, PrintCategory.HASHTAG, skip_toggle)
 
     @staticmethod
     def traceback(e: Exception) -> None:
-        msg = "".join(TracebackException.from_exception(e).format())
+        msg = "".join(format_exception(type(e), e, e.__traceback__))
         Printer.new_print(PrintChannel.ERROR, msg, PrintCategory.GENERAL)
 
     @staticmethod
@@ -266,6 +398,7 @@ class Printer:
 
     @staticmethod
     def table(title: str, headers: tuple[str], tabular_data: list) -> None:
+        from tabulate import tabulate
         Printer.hashtaged(PrintChannel.MANDATORY, title)
         Printer.new_print(PrintChannel.MANDATORY, tabulate(tabular_data, headers=headers, tablefmt='pretty'))
 
@@ -273,30 +406,22 @@ class Printer:
     @staticmethod
     def clear() -> None:
         """ Clear the console window """
-        if platform.system() == WINDOWS_SYSTEM:
+        if IS_WINDOWS:
+            # legacy consoles may not interpret ANSI escapes
             system('cls')
         else:
-            system('clear')
+            sys.stdout.write(CLEAR_SCREEN)
+            sys.stdout.flush()
 
     @staticmethod
     def splash() -> None:
         """ Displays splash screen """
-        Printer.new_print(PrintChannel.SPLASH,
-        "    ███████╗ ██████╗ ████████╗██╗███████╗██╗   ██╗"+"\n"+\
-        "    ╚══███╔╝██╔═══██╗╚══██╔══╝██║██╔════╝╚██╗ ██╔╝"+"\n"+\
-        "      ███╔╝ ██║   ██║   ██║   ██║█████╗   ╚████╔╝ "+"\n"+\
-        "     ███╔╝  ██║   ██║   ██║   ██║██╔══╝    ╚██╔╝  "+"\n"+\
-        "    ███████╗╚██████╔╝   ██║   ██║██║        ██║   "+"\n"+\
-        "    ╚══════╝ ╚═════╝    ╚═╝   ╚═╝╚═╝        ╚═╝   "+"\n" )
+        Printer.new_print(PrintChannel.SPLASH, SPLASH_TEXT)
 
     @staticmethod
     def search_select() -> None:
         """ Displays splash screen """
-        Printer.new_print(PrintChannel.MANDATORY, "\n" +\
-        "> SELECT A DOWNLOAD OPTION BY ID\n" +
-        "> SELECT A RANGE BY ADDING A DASH BETWEEN BOTH ID's\n" +
-        "> OR PARTICULAR OPTIONS BY ADDING A COMMA BETWEEN ID's\n"
-        )
+        Printer.new_print(PrintChannel.MANDATORY, SEARCH_SELECT_TEXT)
 
     @staticmethod
     def back_up() -> None:
@@ -320,7 +445,8 @@ class Printer:
              dynamic_ncols=True
         )
         if not new_pbar.disable:
-             ACTIVE_PBARS.append(new_pbar)
+            with ACTIVE_LOCK:
+                ACTIVE_PBARS.append(new_pbar)
         return new_pbar
 
     @staticmethod
@@ -330,8 +456,9 @@ class Printer:
 
         if not skip_pop and pbar_stack:
             if pbar_stack[-1].n == pbar_stack[-1].total: 
-                pbar_stack.pop()
-                if not pbar_stack[-1].disable: ACTIVE_PBARS.pop()
+                with ACTIVE_LOCK:
+                    pbar_stack.pop()
+                    if not pbar_stack[-1].disable: ACTIVE_PBARS.pop()
 
     @staticmethod
     def pbar_position_handler(default_pos: int, pbar_stack: list[tqdm] | None) -> tuple[int, list[tqdm]]:
@@ -345,6 +472,14 @@ class Printer:
         return pos, pbar_stack
 
 
+LOADER_MODES = {
+    'std1': ("⢿", "⣻", "⣽", "⣾", "⣷", "⣯", "⣟", "⡿"),
+    'std2': ("◜","◝","◞","◟"),
+    'std3': ("😐 ","😐 ","😮 ","😮 ","😦 ","😦 ","😧 ","😧 ","🤯 ","💥 ","✨ ","\u3000 ","\u3000 ","\u3000 "),
+    'prog': ("[∙∙∙]","[●∙∙]","[∙●∙]","[∙∙●]","[∙∙∙]"),
+}
+
+
 class Loader:
     """Busy symbol.
     
@@ -374,18 +509,17 @@ class Loader:
         self.category = PrintCategory.LOADER
 
         self._thread = Thread(target=self._animate, daemon=True)
-        if mode == 'std1':
-            self.steps = ["⢿", "⣻", "⣽", "⣾", "⣷", "⣯", "⣟", "⡿"]
-        elif mode == 'std2':
-            self.steps = ["◜","◝","◞","◟"]
-        elif mode == 'std3':
-            self.steps = ["😐 ","😐 ","😮 ","😮 ","😦 ","😦 ","😧 ","😧 ","🤯 ","💥 ","✨ ","\u3000 ","\u3000 ","\u3000 "]
-        elif mode == 'prog':
-            self.steps = ["[∙∙∙]","[●∙∙]","[∙●∙]","[∙∙●]","[∙∙∙]"]
-
-        self.done = False
-        self.paused = False
-        self.dead = False
+        self.steps = LOADER_MODES.get(mode, LOADER_MODES['prog'])
+        self.frames = tuple(f"{c} {desc}" for c in self.steps)
+
+        self._stopped = Event()
+        self._unpaused = Event()
+        self._unpaused.set()
+        self._suppressed = False
+
+    @property
+    def paused(self) -> bool:
+        return not self._unpaused.is_set()
 
     def _loader_print(self, msg: str):
         Printer.new_print(self.channel, msg, self.category, skip_toggle=True)
@@ -395,47 +529,65 @@ class Loader:
 
     def store_active_loader(self):
         global ACTIVE_LOADER
-        self._inherited_active_loader = ACTIVE_LOADER
-        ACTIVE_LOADER = self
+        with ACTIVE_LOCK:
+            self._inherited_active_loader = ACTIVE_LOADER
+            ACTIVE_LOADER = self
 
     def release_active_loader(self):
         global ACTIVE_LOADER
-        ACTIVE_LOADER = self._inherited_active_loader
+        with ACTIVE_LOCK:
+            ACTIVE_LOADER = self._inherited_active_loader
 
     def start(self):
+        if not Printer._channel_enabled(self.channel):
+            # nothing would be printed, skip the animation thread entirely
+            self._suppressed = True
+            return self
+        if not IS_TTY:
+            # frames would only pile up in the redirected output, say it once instead
+            self._suppressed = True
+            self.category = PrintCategory.GENERAL
+            self._loader_print(self.desc)
+            return self
         self.store_active_loader()
+        self._loader_print(self.frames[0]) # prime the first frame, _animate picks up from the next
         self._thread.start()
-        sleep(self.timeout*2) #guarantee _animate can print at least once
         return self
 
     def _animate(self):
-        for c in cycle(self.steps):
-            if self.done:
+        for frame in islice(cycle(self.frames), 1, None):
+            # doubles as the frame delay, returning early once stop() is called
+            if self._stopped.wait(self.timeout):
                 break
-            elif not self.paused:
-                self._loader_print(f"{c} {self.desc}")
-            sleep(self.timeout)
-        self.dead = True
+            if not self._unpaused.is_set():
+                # park until resume() (or stop()) instead of ticking through the pause
+                self._unpaused.wait()
+                if self._stopped.is_set():
+                    break
+            self._loader_print(frame)
 
     def __enter__(self):
         self.start()
 
     def stop(self):
-        self.done = True
-        while not self.dead: #guarantee _animate has finished
-            sleep(self.timeout) 
+        if self._suppressed:
+            if self.end != "":
+                self._loader_print(self.end)
+            return
+        self._stopped.set()
+        self._unpaused.set() # wake _animate if it is parked on a pause
+        self._thread.join() #guarantee _animate has finished
         self.category = PrintCategory.LOADER
         if self.end != "":
             self._loader_print(self.end)
         self.release_active_loader()
 
     def pause(self):
-        self.paused = True
+        self._unpaused.clear()
 
     def resume(self):
         self.category = PrintCategory.LOADER
-        self.paused = False
-        sleep(self.timeout*2) #guarantee _animate can print at least once
+        self._unpaused.set()
 
     def __exit__(self, exc_type, exc_value, tb):
         # handle exceptions with those variables ^
@@ -12,12 +12,13 @@ from mutagen import File
 from mutagen._vorbis import VComment
 from mutagen.oggvorbis import OggVorbis
 from mutagen.flac import FLAC
+from functools import lru_cache
 from time import sleep
 from pathlib import Path, PurePath
 
 from zotify.config import Zotify
 from zotify.const import ALBUMARTIST, ARTIST, TRACKTITLE, ALBUM, YEAR, DISCNUMBER, TRACKNUMBER, ARTWORK, \
-    TOTALTRACKS, TOTALDISCS, EXT_MAP, LYRICS, COMPILATION, GENRE, EXT_MAP, MP3_CUSTOM_TAG_PREFIX, M4A_CUSTOM_TAG_PREFIX, NAME, SHOW, DESCRIPTION, COMMENT
+    TOTALTRACKS, TOTALDISCS, EXT_MAP, AUDIO_EXTENSIONS, LYRICS, COMPILATION, GENRE, EXT_MAP, MP3_CUSTOM_TAG_PREFIX, M4A_CUSTOM_TAG_PREFIX, NAME, SHOW, DESCRIPTION, COMMENT
 from zotify.termoutput import PrintChannel, Printer
 
 
@@ -35,6 +36,12 @@ def create_download_directory(dir_path: str | PurePath) -> None:
             pass
 
 
+@lru_cache(maxsize=4096)
+def sanitize_filename(name: str) -> str:
+    """ Cached character replacement half of fix_filename, independent of config """
+    return re.sub(r'[/\\:|<>"?*\0-\x1f]|^(AUX|COM[1-9]|CON|LPT[1-9]|NUL|PRN)(?![^.])|^\s|[\s.]$', "_", name, flags=re.IGNORECASE)
+
+
 def fix_filename(name: str | PurePath | Path ):
     """
     Replace invalid characters on Linux/Windows/MacOS with underscores.
@@ -51,7 +58,7 @@ def fix_filename(name: str | PurePath | Path ):
     >>> all('_' == fix_filename(chr(i)) for i in list(range(32)))
     True
     """
-    name = re.sub(r'[/\\:|<>"?*\0-\x1f]|^(AUX|COM[1-9]|CON|LPT[1-9]|NUL|PRN)(?![^.])|^\s|[\s.]$', "_", str(name), flags=re.IGNORECASE)
+    name = sanitize_filename(str(name))
     
     maxlen = Zotify.CONFIG.get_max_filename_length()
     if maxlen and len(name) > maxlen:
@@ -88,10 +95,11 @@ def fill_output_template(output_template: str, track_metadata: dict, extra_keys:
 def walk_directory_for_tracks(path: str | PurePath) -> set[Path]:
     # path must already exist
     track_paths = set()
+    extensions = tuple(AUDIO_EXTENSIONS)
     
     for dirpath, dirnames, filenames in os.walk(Path(path)):
         for filename in filenames:
-            if filename.endswith(tuple(set(EXT_MAP.values()))):
+            if filename.endswith(extensions):
                 track_paths.update({Path(dirpath) / filename,})
     
     return track_paths